@@ -1,13 +1,22 @@
 import json
+import os
 import re
 import shutil
 import sys
-from os import getcwd, walk
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import DEBUG
 from pathlib import Path
 from subprocess import TimeoutExpired, run
-from typing import Any, Dict, Optional, Sequence, Set, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads  # faster parsing, if available
+except ImportError:
+    from json import loads as json_loads  # type: ignore
 
 from ark.overrides import get_overrides
 from config import ConfigFile, get_global_config
@@ -23,9 +32,19 @@ __all__ = ('ArkSteamManager', )
 
 ARK_SERVER_APP_ID = 376030
 ARK_MAIN_APP_ID = 346110
+ARK_MAIN_APP_ID_STR = str(ARK_MAIN_APP_ID)
 
 MODDATA_FILENAME = '_moddata.json'
 
+VERSION_REGEX = re.compile(r'\d+(?:\.\d+)*')
+SERVER_VERSION_OUTPUT_REGEX = re.compile(rb'ARK Version: (.*)')
+
+VERSION_API_URL = 'http://arkdedicated.com/version'
+VERSION_API_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+UNPACK_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+MOD_UNPACK_WORKERS = min(4, os.cpu_count() or 1)
+
 logger = get_logger(__name__)
 
 
@@ -50,6 +69,7 @@ class ArkSteamManager:
 
         self.steam_mod_details: Optional[Dict[str, Dict]] = None  # from steam
         self.mod_data_cache: Optional[Dict[str, Dict]] = None  # internal data
+        self.mod_data_matches_disk = False  # False if unrequested mods were dropped from the cache but left installed
         self.game_version: Optional[str] = None
         self.game_buildid: Optional[str] = None
 
@@ -87,10 +107,11 @@ class ArkSteamManager:
         modid = str(modid)
 
         # Official "mods" get a custom moddata using the game's version
-        if modid in self.config.official_mods.ids():
+        official_tag = self.config.official_mods.tag_from_id(modid)
+        if official_tag:
             data = dict(id=modid)
             data['version'] = self.getGameBuildId() or '0'
-            data['name'] = self.config.official_mods.tag_from_id(modid)
+            data['name'] = official_tag
             data['title'] = data['name']
             return data
 
@@ -153,6 +174,7 @@ class ArkSteamManager:
 
         # Find currently installed mods (file search for our _moddata.json)
         self.mod_data_cache = findInstalledMods(self.asset_path)
+        self.mod_data_matches_disk = False
         modids_installed = set(self.mod_data_cache.keys())
 
         # Compare lists to calculate mods to 'add/keep/remove'
@@ -178,9 +200,10 @@ class ArkSteamManager:
                 return True
             return int(workshop_details['time_updated']) > int(existing_data['version'])
 
-        modids_update = set(modid for modid in modids_requested
-                            if isOutdated(self.mod_data_cache.get(modid, None), self.steam_mod_details.get(modid, None)))
-        modids_update = modids_update | modids_add
+        cached_data = self.mod_data_cache.get
+        workshop_details = self.steam_mod_details.get
+        modids_update = {modid for modid in modids_requested if isOutdated(cached_data(modid), workshop_details(modid))}
+        modids_update |= modids_add
 
         # Fetch updated mods, then unpack
         if modids_update:
@@ -213,53 +236,86 @@ class ArkSteamManager:
         # Remove mod data for mods that are no longer present
         for modid in modids_remove:
             self.mod_data_cache.pop(modid, None)
+        self.mod_data_matches_disk = not modids_remove or (uninstallOthers and not dryRun)
 
         # Verify there are no overlapping mod tags
-        tag_list = [data['name'].lower() for data in self.mod_data_cache.values()]
-        if len(set(tag_list)) != len(tag_list):
-            raise ValueError('There are mods with duplicate tag names present. Aborting.')
+        seen_tags: Set[str] = set()
+        for data in self.mod_data_cache.values():
+            tag = data['name'].lower()
+            if tag in seen_tags:
+                raise ValueError(f'There are mods with duplicate tag names present ({data["name"]}). Aborting.')
+            seen_tags.add(tag)
 
     def _installMods(self, modids):
-        # TODO: Consider doing the extractions in parallel with the installations (offset) to speed this up
-
+        # Downloads are serialised by steamcmd, so unpack each mod in the background while the next downloads
+        unpacks: Dict[str, Future] = dict()
+        try:
+            with ThreadPoolExecutor(max_workers=MOD_UNPACK_WORKERS) as pool:
+                for modid in modids:
+                    self._downloadMod(modid)
+                    unpacks[modid] = pool.submit(self._unpackMod, modid)
+
+                for unpack in unpacks.values():
+                    unpack.result()
+        finally:
+            # Record every mod that was fully unpacked, even if another failed, so it isn't fetched again next run
+            # (the pool has shut down by now, so all submitted unpacks are done)
+            unpacked = [modid for modid, unpack in unpacks.items() if not unpack.exception()]
+            if unpacked:
+                self._saveModsData(unpacked)
+
+    def _saveModsData(self, modids):
+        # Collect mod version numbers from workshop data file
+        newVersions = getSteamModVersions(self.gamedata_path, modids)
+
+        # Parsing the PGD for the title relies on the current thread's parsing context, so finish up here
         for modid in modids:
-            # Get Steam to download the mod, compressed
-            logger.debug(f'Installing/updating mod {modid}')
-            self.steamcmd.install_workshopfiles(str(ARK_MAIN_APP_ID), modid, self.gamedata_path)
-            if not verifyModDownloaded(self.gamedata_path, modid):
-                raise FileNotFoundError("Mod was not downloaded despite successful retcode - is it still available?")
+            self._saveModData(modid, newVersions[modid])
 
-            # Unpack the mod into the game directory proper
-            logger.debug(f'Unpacking mod {modid}')
-            unpackMod(self.gamedata_path, modid)
+    def _downloadMod(self, modid):
+        # Get Steam to download the mod, compressed
+        logger.debug(f'Installing/updating mod {modid}')
+        self.steamcmd.install_workshopfiles(ARK_MAIN_APP_ID_STR, modid, self.gamedata_path)
+        if not verifyModDownloaded(self.gamedata_path, modid):
+            raise FileNotFoundError("Mod was not downloaded despite successful retcode - is it still available?")
 
-            # Collection mod version number from workshop data file
-            newVersions = getSteamModVersions(self.gamedata_path, [modid])
+    def _unpackMod(self, modid):
+        # Unpack the mod into the game directory proper
+        logger.debug(f'Unpacking mod {modid}')
+        unpackMod(self.gamedata_path, modid)
 
-            # Save data on the installed mod
-            moddata = gatherModInfo(self.asset_path, modid)
-            moddata['version'] = str(newVersions[modid])
+    def _saveModData(self, modid, version):
+        # Save data on the installed mod
+        moddata = gatherModInfo(self.asset_path, modid)
+        moddata['version'] = str(version)
 
-            # See if we got a title for this mod from either the mod's PGD or the SteamAPI earlier
-            moddata['title'] = self._fetch_mod_title(moddata)
+        # See if we got a title for this mod from either the mod's PGD or the SteamAPI earlier
+        moddata['title'] = self._fetch_mod_title(moddata)
 
-            moddata_path = self.mods_path / modid / MODDATA_FILENAME
-            with open(moddata_path, 'wt', encoding='utf-8') as f:
-                json.dump(moddata, f, indent='\t')
+        moddata_path = self.mods_path / modid / MODDATA_FILENAME
+        with open(moddata_path, 'wt', encoding='utf-8') as f:
+            json.dump(moddata, f, indent='\t')
 
-            # Save the data so we can refer to it later
-            self.mod_data_cache[modid] = moddata
+        # Save the data so we can refer to it later
+        self.mod_data_cache[modid] = moddata
 
     def _fetch_mod_title_from_pgd(self, moddata):
+        pkg = moddata['package']
+        if not pkg:
+            return None
+
         resolver = FixedModResolver({moddata['name']: moddata['id']})
         loader = AssetLoader(modresolver=resolver, assetpath=self.asset_path)
-        pkg = moddata['package']
 
-        if pkg:
-            pgd_asset = loader[moddata['package']]
-            title = pgd_asset.default_export.properties.get_property('ModName', fallback=None)
-            if title:
-                return str(title)
+        # Properties must be parsed during the load, as the file's memory is released as soon as it completes
+        pgd_asset = loader.load_asset(pkg, cache_result=False)
+        pgd_export = pgd_asset.default_export
+        if not pgd_export:
+            return None
+
+        title = pgd_export.properties.get_property('ModName', fallback=None)
+        if title:
+            return str(title)
 
         return None
 
@@ -268,8 +324,8 @@ class ArkSteamManager:
         title = self._fetch_mod_title_from_pgd(moddata)
 
         # Fallback to a name provided by SteamAPI (if any)
-        if not title and modid in self.steam_mod_details and 'title' in self.steam_mod_details[modid]:
-            title = self.steam_mod_details[modid]['title']  # ^ inefficient
+        if not title:
+            title = (self.steam_mod_details or dict()).get(modid, dict()).get('title', None)
 
         # Fallback to mod tag prettified with UE-like rules
         if not title:
@@ -280,7 +336,7 @@ class ArkSteamManager:
     def _removeMods(self, modids):
         # Remove the installed mods
         for modid in modids:
-            modpath: Path = self.gamedata_path / 'ShooterGame' / 'Content' / 'Mods' / str(modid)
+            modpath: Path = self.mods_path / modid
             if modpath.is_dir():
                 shutil.rmtree(modpath, ignore_errors=True)
 
@@ -310,14 +366,22 @@ class ManagedModResolver(ModResolver):
         self.asset_path = manager.asset_path
         self.dataCache = dict()
         self.modNameToIds = dict()
+        self.modExactNameToIds = dict()
 
     def initialise(self):
-        self.dataCache = findInstalledMods(self.asset_path)
+        # Re-use the manager's view of installed mods if it is known to cover everything on disk
+        if self.manager.mod_data_cache is not None and self.manager.mod_data_matches_disk:
+            self.dataCache = dict(self.manager.mod_data_cache)
+        else:
+            self.dataCache = findInstalledMods(self.asset_path)
         self.modNameToIds = dict((data['name'].lower(), data['id']) for data in self.dataCache.values())
-        for modid in get_global_config().official_mods.ids():
-            name = get_global_config().official_mods.tag_from_id(modid)
+        self.modExactNameToIds = dict((data['name'], data['id']) for data in self.dataCache.values())
+        official_mods = get_global_config().official_mods
+        for modid in official_mods.ids():
+            name = official_mods.tag_from_id(modid)
             self.dataCache[modid] = dict(id=modid, name=name, official=True)
             self.modNameToIds[name.lower()] = modid
+            self.modExactNameToIds[name] = modid
         return self
 
     def get_name_from_id(self, modid: str) -> str:
@@ -327,7 +391,8 @@ class ManagedModResolver(ModResolver):
         return data['name']
 
     def get_id_from_name(self, name: str) -> str:
-        modid = self.modNameToIds.get(name.lower(), None)
+        # Names from cleaned asset paths are already in their canonical case
+        modid = self.modExactNameToIds.get(name, None) or self.modNameToIds.get(name.lower(), None)
         if not modid:
             raise ModNotFound(name)
         return modid
@@ -354,16 +419,31 @@ def findInstalledMods(asset_path: Path) -> Dict[str, Dict]:
     '''Scan installed modules and return their information in a Dict[id->data].'''
     mods_path: Path = asset_path / 'Content' / 'Mods'
     result: Dict[str, Any] = dict()
-    for filename in mods_path.glob('*/' + MODDATA_FILENAME):
-        modid: str = filename.parent.name
-        data = readModData(asset_path, modid)
-        result[modid] = data
+    if not mods_path.is_dir():
+        return result
+
+    # A single scandir pass uses the cached dirent types, avoiding a stat per entry
+    with os.scandir(mods_path) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            data = _readModDataAt(os.path.join(entry.path, MODDATA_FILENAME), entry.name)
+            if data is not None:
+                result[entry.name] = data
 
     return result
 
 
+_http_session = requests.Session()
+_http_session.mount('http://', HTTPAdapter(max_retries=Retry(total=2, backoff_factor=0.3)))
+
+
 def _fetchGameVersionFromAPI() -> Optional[str]:
-    rsp = requests.get('http://arkdedicated.com/version')
+    try:
+        rsp = _http_session.get(VERSION_API_URL, timeout=VERSION_API_TIMEOUT)
+    except requests.RequestException as ex:
+        logger.warning("Unable to contact official servers API: %s", ex)
+        return None
     if rsp.status_code != 200:
         return None
     version = (rsp.text or '').strip()
@@ -379,11 +459,15 @@ def _fetchGameVersionFromFile(gamedata_path: Path) -> Optional[str]:
     return version
 
 
+def isValidVersion(version: str) -> bool:
+    return VERSION_REGEX.fullmatch(version) is not None
+
+
 def fetchGameVersion(gamedata_path: Path, skip_exe=False) -> str:
     # Try to run the server itself and grab its version output
     exe_version = getGameVersionFromServerExe(gamedata_path) if not skip_exe else None
     if exe_version:
-        if not re.fullmatch(r"\d+(\.\d+)*", exe_version, re.I):
+        if not isValidVersion(exe_version):
             logger.warning("Invalid version number returned from running Ark server: %s", exe_version)
             exe_version = None
         else:
@@ -392,7 +476,7 @@ def fetchGameVersion(gamedata_path: Path, skip_exe=False) -> str:
     # Try version.txt in depot... cross fingers
     txt_version = _fetchGameVersionFromFile(gamedata_path)
     if txt_version:
-        if not re.fullmatch(r"\d+(\.\d+)*", txt_version, re.I):
+        if not isValidVersion(txt_version):
             logger.warning("Invalid version number in version.txt: %s", txt_version)
             txt_version = None
         else:
@@ -401,7 +485,7 @@ def fetchGameVersion(gamedata_path: Path, skip_exe=False) -> str:
     # Fetch official server network version API
     api_version = _fetchGameVersionFromAPI()
     if api_version:
-        if not re.fullmatch(r"\d+(\.\d+)*", api_version, re.I):
+        if not isValidVersion(api_version):
             logger.warning("Invalid version from official servers API : %s", api_version)
             api_version = None
         else:
@@ -447,9 +531,8 @@ def getGameBuildId(game_path: Path, app_id: str | int) -> str:
     return buildid
 
 
-def gatherModInfo(asset_path: Path, modid) -> Dict[str, Any]:
+def gatherModInfo(asset_path: Path, modid: str) -> Dict[str, Any]:
     '''Gather information from mod.info and modmeta.info and collate into an info structure.'''
-    modid = str(modid)
     modpath: Path = asset_path / 'Content' / 'Mods' / modid
 
     modinfo = readModInfo(modpath / 'mod.info')
@@ -467,54 +550,97 @@ def gatherModInfo(asset_path: Path, modid) -> Dict[str, Any]:
     return moddata
 
 
-def readModData(asset_path: Path, modid) -> Optional[Dict[str, Any]]:
-    modid = str(modid)
+def readModData(asset_path: Path, modid: str) -> Optional[Dict[str, Any]]:
     moddata_path: Path = asset_path / 'Content' / 'Mods' / modid / MODDATA_FILENAME
+    return _readModDataAt(moddata_path, modid)
+
+
+def _readModDataAt(moddata_path: str | Path, modid: str) -> Optional[Dict[str, Any]]:
+    '''Read a mod's data file from a known location, returning None if it does not exist.'''
     logger.debug(f'Loading mod {modid} metadata')
-    if not moddata_path.is_file():
+    try:
+        with open(moddata_path, 'rb') as f:
+            moddata = json_loads(f.read())
+    except (FileNotFoundError, NotADirectoryError):
         logger.debug(f'Couldn\'t find mod data at "{moddata_path}"')
         return None
 
-    with open(moddata_path, 'rt', encoding='utf-8') as f:
-        moddata = json.load(f)
-
     return moddata
 
 
-def verifyModDownloaded(game_path, modid):
-    srcPath = game_path / 'steamapps' / 'workshop' / 'content' / str(ARK_MAIN_APP_ID) / str(modid) / 'WindowsNoEditor'
+def verifyModDownloaded(game_path: Path, modid: str):
+    srcPath = game_path / 'steamapps' / 'workshop' / 'content' / ARK_MAIN_APP_ID_STR / modid / 'WindowsNoEditor'
     return srcPath.is_dir()
 
 
-def unpackMod(game_path, modid):
+def unpackMod(game_path: Path, modid: str):
     '''Unpack a compressed steam mod.'''
-    srcPath: Path = game_path / 'steamapps' / 'workshop' / 'content' / str(ARK_MAIN_APP_ID) / str(modid) / 'WindowsNoEditor'
-    dstPath: Path = game_path / 'ShooterGame' / 'Content' / 'Mods' / str(modid)
+    srcPath: Path = game_path / 'steamapps' / 'workshop' / 'content' / ARK_MAIN_APP_ID_STR / modid / 'WindowsNoEditor'
+    dstPath: Path = game_path / 'ShooterGame' / 'Content' / 'Mods' / modid
 
     if dstPath.is_dir():
         shutil.rmtree(dstPath)
 
-    for curdir, _, files in walk(srcPath):
-        curdir = Path(curdir).relative_to(srcPath)
-        for filename in files:
-            filename = Path(filename)
-            if filename.suffix.lower() == '.z':
+    src_str = str(srcPath)
+    dst_str = str(dstPath)
+    debug = logger.isEnabledFor(DEBUG)
+
+    # Collect the work to be done first, so each output directory is only created once
+    operations: List[Tuple[Callable[[str, str], Any], str, str]] = []
+    dst_dirs: List[str] = []
+    for reldir, files in _walkFiles(src_str):
+        dst_dir = os.path.join(dst_str, reldir) if reldir else dst_str
+        count_before = len(operations)
+        for entry in files:
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext == '.z':
                 # decompress
-                src = srcPath / curdir / filename
-                dst = dstPath / curdir / filename.stem
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                logger.debug(f'Decompressing {src} -> {dst}')
-                unpackModFile(src, dst)
-            elif filename.suffix.lower() == '.uncompressed_size':
+                dst = os.path.join(dst_dir, stem)
+                if debug:
+                    logger.debug(f'Decompressing {entry.path} -> {dst}')
+                operations.append((unpackModFile, entry.path, dst))
+            elif ext == '.uncompressed_size':
                 # ignore
                 pass
             else:
-                # just copy
-                src = srcPath / curdir / filename
-                dst = dstPath / curdir / filename
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                logger.debug(f'Copying {src} -> {dst}')
-                shutil.copyfile(src, dst)
+                # just copy (copyfile already uses sendfile on Linux and a 1MiB buffer on Windows)
+                dst = os.path.join(dst_dir, entry.name)
+                if debug:
+                    logger.debug(f'Copying {entry.path} -> {dst}')
+                operations.append((shutil.copyfile, entry.path, dst))
+
+        if len(operations) > count_before:
+            dst_dirs.append(dst_dir)
+
+    for dst_dir in dst_dirs:
+        os.makedirs(dst_dir, exist_ok=True)
+
+    # File operations are I/O bound or release the GIL, so run them in parallel
+    with ThreadPoolExecutor(max_workers=UNPACK_MAX_WORKERS) as pool:
+        futures = [pool.submit(fn, src, dst) for fn, src, dst in operations]
+        for future in futures:
+            future.result()
+
+
+def _walkFiles(path: str) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+    '''
+    Recursively walk the given directory, yielding (relative_dir, file_entries) for each directory found.
+    The relative directory is an empty string for the top-level directory.
+    '''
+    prefix_len = len(path) + len(os.sep)
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        files = []
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                else:
+                    files.append(entry)
+
+        yield (current[prefix_len:], files)
 
 
 def getGameVersionFromServerExe(game_path: Path) -> Optional[str]:
@@ -532,7 +658,7 @@ def getGameVersionFromServerExe(game_path: Path) -> Optional[str]:
         return None
 
     # Prep paths and command
-    local_app_path_str = str(Path(getcwd()).resolve().absolute())
+    local_app_path_str = str(Path(os.getcwd()).resolve().absolute())
     local_livedata_path_str = str(get_global_config().settings.DataDir.resolve().absolute())
     remote_app_path_str = '/app' if docker else local_app_path_str
     game_path_str = f'/app/livedata/{game_path.name}' if docker else str(game_path)
@@ -553,7 +679,8 @@ def getGameVersionFromServerExe(game_path: Path) -> Optional[str]:
 
     # Run with timeout
     try:
-        result = run(cmd, shell=not docker, capture_output=True, text=True, timeout=90)
+        # Output is kept as bytes as the server is verbose and we only need one line of it
+        result = run(cmd, shell=not docker, capture_output=True, timeout=90)
     except (TimeoutError, TimeoutExpired):
         logger.warning("Collecting version by running Ark server timed out")
         if docker:
@@ -576,11 +703,13 @@ def getGameVersionFromServerExe(game_path: Path) -> Optional[str]:
         return None
 
     # Grab the version out of the output
-    match = re.search(r'ARK Version: (.*)', result.stdout)
+    match = SERVER_VERSION_OUTPUT_REGEX.search(result.stdout)
     if not match:
         logger.warning("Collecting version by running Ark server failed with unexpected output (see debug.log)")
-        logger.debug("Collecting version by running Ark server failed with unexpected output:\n%s", result.stdout)
+        if logger.isEnabledFor(DEBUG):
+            logger.debug("Collecting version by running Ark server failed with unexpected output:\n%s",
+                         result.stdout.decode('utf-8', errors='replace'))
         return None
 
-    version = match[1].strip()
+    version = match[1].decode('utf-8', errors='replace').strip()
     return version
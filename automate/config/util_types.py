@@ -50,6 +50,9 @@ class ModIdAccess:
     def tags(self) -> Iterable[str]:
         return self.ids_to_tags.values()
 
+    def has_id(self, modid: str) -> bool:
+        return modid.lower() in self.ids_to_tags
+
     def id_from_tag(self, tag: str):
         return self.tags_to_ids.get(tag.lower(), None)
 
@@ -138,7 +138,7 @@ class JsonHierarchyExportStage(ExportStage, metaclass=ABCMeta):
             assert mod_data
             title = mod_data['title'] or mod_data['name']
             metadata = dict(mod=dict(id=modid, tag=mod_data['name'], title=title))
-            if modid in self.manager.config.official_mods.ids():
+            if self.manager.config.official_mods.has_id(modid):
                 metadata['mod']['official'] = True
             if modid in self.manager.config.expansions.ids():
                 metadata['mod']['expansion'] = True
@@ -1,7 +1,9 @@
+import re
 import zlib
 from pathlib import Path
 from typing import Optional
 
+from ue.loader import load_file_into_memory
 from ue.stream import MemoryStream
 from utils.log import get_logger
 
@@ -17,6 +19,9 @@ __all__ = (
 
 logger = get_logger(__name__)
 
+DECOMPRESS_BLOCK_SIZE = 64 * 1024
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class DecompressionError(Exception):
     '''An error occurred during file decompression.'''
@@ -49,20 +54,29 @@ def unpackModFile(src: str, dst: str):
 
     assert sizeFound == sizeUnpacked, DecompressionError("Invalid chunk sizes in downloaded mod")
 
-    with open(dst, 'wb', buffering=64 * 1024) as of:
+    with open(dst, 'wb', buffering=WRITE_BUFFER_SIZE) as of:
         for i, (csCompressed, csUncompressed) in enumerate(chunkSizes):
-            chunkData = f.readBytes(csCompressed)
-            uncompressedChunkData = zlib.decompress(chunkData)
-            del chunkData
-
-            assert len(uncompressedChunkData) == csUncompressed, DecompressionError(
+            # Decompress incrementally so the whole compressed chunk is never copied out at once
+            decompressor = zlib.decompressobj()
+            sizeProduced = 0
+            remaining = csCompressed
+            while remaining:
+                block = f.readBytes(min(remaining, DECOMPRESS_BLOCK_SIZE))
+                remaining -= len(block)
+                uncompressedData = decompressor.decompress(block)
+                sizeProduced += len(uncompressedData)
+                of.write(uncompressedData)
+
+            uncompressedData = decompressor.flush()
+            sizeProduced += len(uncompressedData)
+            of.write(uncompressedData)
+
+            assert decompressor.eof, DecompressionError("Downloaded mod chunk is truncated")
+            assert sizeProduced == csUncompressed, DecompressionError(
                 "Decompression of downloaded mod chunk failed verification")
-            assert len(uncompressedChunkData) == sizeUnpackedChunk or i + 1 == len(chunkSizes), DecompressionError(
+            assert sizeProduced == sizeUnpackedChunk or i + 1 == len(chunkSizes), DecompressionError(
                 "Chunk of downloaded mod is not the expected size")
 
-            of.write(uncompressedChunkData)
-            del uncompressedChunkData
-
 
 def readACFFile(filename: str | Path, outputType: type = dict):
     content = Path(filename).read_text(encoding='utf-8')
@@ -70,37 +84,33 @@ def readACFFile(filename: str | Path, outputType: type = dict):
     return data
 
 
+# Tokens in an ACF file: a "key" "value" pair on one line, a lone "section name", or a brace
+ACF_TOKEN_REGEX = re.compile(r'"((?:[^"\\]|\\.)*)"[ \t]+"((?:[^"\\]|\\.)*)"|"((?:[^"\\]|\\.)*)"|([{}])')
+
+
 def parseAcf(data: str, outputType=dict):
-    '''Adapted from github.com/leovp/steamfiles (MIT licensed).'''
+    '''Originally adapted from github.com/leovp/steamfiles (MIT licensed).'''
     output = outputType()
     current_section = output
-    sections: list[str] = []
-
-    for line in data.splitlines():
-        if not line:
-            break
-        line = line.strip()
-        try:
-            key, value = line.split(None, 1)
-            key = key.replace('"', '').lstrip()
-            value = value.replace('"', '').rstrip()
-        except ValueError:
-            if line == '{':
-                # Initialize the last added section.
-                current = output
-                for i in sections[:-1]:
-                    current = current[i]
-                current[sections[-1]] = outputType()
-                current_section = current[sections[-1]]
-            elif line == '}':
-                # Remove the last section from the queue.
-                sections.pop()
-            else:
-                # Add a new section to the queue.
-                sections.append(line.replace('"', ''))
-            continue
-
-        current_section[key] = value
+    parents: list = []  # stack of sections enclosing the current one
+    section_name = None
+
+    for match in ACF_TOKEN_REGEX.finditer(data):
+        key, value, name, brace = match.groups()
+        if value is not None:
+            current_section[key] = value
+        elif name is not None:
+            # Remember the name of the section about to open
+            section_name = name
+        elif brace == '{':
+            # Open the section named by the previous token
+            new_section = outputType()
+            current_section[section_name] = new_section
+            parents.append(current_section)
+            current_section = new_section
+        else:
+            # Return to the enclosing section
+            current_section = parents.pop()
 
     return output
 
@@ -109,16 +119,15 @@ def readModInfo(filename):
     f = loadFileAsStream(filename)
     modname = readUnrealString(f)
     countMaps = f.readUInt32()
-    maps = (readUnrealString(f) for i in range(countMaps))
-    result = dict(modname=modname, maps=tuple(maps))
-    return result
+    maps = tuple([readUnrealString(f) for _ in range(countMaps)])
+    return dict(modname=modname, maps=maps)
 
 
 def readModMetaInfo(filename):
     f = loadFileAsStream(filename)
     countEntries = f.readUInt32()
-    entries = [(readUnrealString(f), readUnrealString(f)) for i in range(countEntries)]
-    return dict(entries)
+    # Keys are evaluated before values, so each pair is read in file order
+    return {readUnrealString(f): readUnrealString(f) for _ in range(countEntries)}
 
 
 def readUnrealString(f: MemoryStream) -> Optional[str]:
@@ -127,14 +136,10 @@ def readUnrealString(f: MemoryStream) -> Optional[str]:
         raise ValueError("UTF16 string detected - add support here!")
     if count == 0:
         return None
-    data = f.readBytes(count)
-    string = data.decode('utf8')[:-1]
-    return string
+    return f.readTerminatedString(count)
 
 
 def loadFileAsStream(filename):
-    with open(filename, 'rb') as f:
-        data = f.read()
-        mem = memoryview(data)
-        stream = MemoryStream(mem)
-        return stream
+    mem = load_file_into_memory(filename)
+    stream = MemoryStream(mem)
+    return stream
@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from .ark import MODDATA_FILENAME, ArkSteamManager, ManagedModResolver
+
+
+def _install_fake_mod(asset_path: Path, modid: str, name: str):
+    mod_path = asset_path / 'Content' / 'Mods' / modid
+    mod_path.mkdir(parents=True)
+    (mod_path / MODDATA_FILENAME).write_text(json.dumps(dict(id=modid, name=name)))
+
+
+def test_resolver_reuses_manager_data_matching_disk(tmp_path: Path):
+    manager = SimpleNamespace(asset_path=tmp_path,
+                              mod_data_cache={'111': dict(id='111', name='Cached')},
+                              mod_data_matches_disk=True)
+    resolver = ManagedModResolver(manager).initialise()
+
+    assert resolver.get_name_from_id('111') == 'Cached'
+    assert resolver.get_id_from_name('Cached') == '111'
+
+
+def test_resolver_scans_disk_when_manager_data_incomplete(tmp_path: Path):
+    # An unrequested mod that was dropped from the manager's data but left installed
+    _install_fake_mod(tmp_path, '222', 'LeftBehind')
+    manager = SimpleNamespace(asset_path=tmp_path, mod_data_cache=dict(), mod_data_matches_disk=False)
+    resolver = ManagedModResolver(manager).initialise()
+
+    assert resolver.get_name_from_id('222') == 'LeftBehind'
+    assert resolver.get_id_from_name('LeftBehind') == '222'
+
+
+class InstallRecorder(ArkSteamManager):
+    '''Replaces the Steam and disk work of mod installation, recording which mods get their data saved.'''
+
+    def __init__(self):  # pylint: disable=super-init-not-called
+        self.saved: List[str] = []
+
+    def _downloadMod(self, modid):
+        if modid == 'missing':
+            raise FileNotFoundError("Mod was not downloaded")
+
+    def _unpackMod(self, modid):
+        pass
+
+    def _saveModsData(self, modids):
+        self.saved.extend(modids)
+
+
+def test_install_mods_saves_unpacked_mods_on_failure():
+    arkman = InstallRecorder()
+    with pytest.raises(FileNotFoundError):
+        arkman._installMods(['111', '222', 'missing', '333'])  # pylint: disable=protected-access
+
+    assert arkman.saved == ['111', '222']
@@ -0,0 +1,125 @@
+import struct
+import zlib
+from pathlib import Path
+
+import pytest
+
+from .modutils import parseAcf, readACFFile, readModInfo, readModMetaInfo, unpackModFile
+
+APPWORKSHOP_ACF = '''\
+"AppWorkshop"
+{
+\t"appid"\t\t"346110"
+\t"SizeOnDisk"\t\t"123456"
+\t"WorkshopItemsInstalled"
+\t{
+\t\t"1821554891"
+\t\t{
+\t\t\t"size"\t\t"5555"
+\t\t\t"timeupdated"\t\t"1600000000"
+\t\t}
+\t}
+\t"WorkshopItemDetails"
+\t{
+\t\t"1821554891"
+\t\t{
+\t\t\t"manifest"\t\t"987654321"
+\t\t\t"timeupdated"\t\t"1600000001"
+\t\t}
+\t\t"839162288"
+\t\t{
+\t\t\t"timeupdated"\t\t"1500000000"
+\t\t}
+\t}
+\t"NeedsDownload"\t\t"0"
+}
+'''
+
+
+def test_parse_acf_nested_sections():
+    data = parseAcf(APPWORKSHOP_ACF)
+    root = data['AppWorkshop']
+    assert root['appid'] == '346110'
+    assert root['WorkshopItemsInstalled'] == {'1821554891': {'size': '5555', 'timeupdated': '1600000000'}}
+    assert root['WorkshopItemDetails']['1821554891'] == {'manifest': '987654321', 'timeupdated': '1600000001'}
+    assert root['WorkshopItemDetails']['839162288'] == {'timeupdated': '1500000000'}
+
+
+def test_parse_acf_values_after_section():
+    data = parseAcf(APPWORKSHOP_ACF)
+    assert data['AppWorkshop']['NeedsDownload'] == '0'
+    assert 'NeedsDownload' not in data['AppWorkshop']['WorkshopItemDetails']
+
+
+def test_parse_acf_values_with_spaces():
+    data = parseAcf('"AppState"\n{\n\t"name"\t\t"ARK Survival Evolved Dedicated Server"\n}\n')
+    assert data == {'AppState': {'name': 'ARK Survival Evolved Dedicated Server'}}
+
+
+def _pack_mod_file(data: bytes, chunk_size: int) -> bytes:
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    compressed = [zlib.compress(chunk) for chunk in chunks]
+    header = struct.pack('<QQQQ', 0x9e2a83c1, chunk_size, sum(len(c) for c in compressed), len(data))
+    table = b''.join(struct.pack('<QQ', len(c), len(u)) for c, u in zip(compressed, chunks))
+    return header + table + b''.join(compressed)
+
+
+def test_unpack_mod_file(tmp_path: Path):
+    data = bytes(range(256)) * 2000 + b'tail'
+    src = tmp_path / 'asset.uasset.z'
+    dst = tmp_path / 'asset.uasset'
+    src.write_bytes(_pack_mod_file(data, 128 * 1024))
+
+    unpackModFile(str(src), str(dst))
+
+    assert dst.read_bytes() == data
+
+
+def test_unpack_mod_file_truncated(tmp_path: Path):
+    packed = _pack_mod_file(b'x' * 1000, 128 * 1024)
+    src = tmp_path / 'asset.uasset.z'
+    src.write_bytes(packed[:-4])
+
+    with pytest.raises((AssertionError, EOFError)):
+        unpackModFile(str(src), str(tmp_path / 'asset.uasset'))
+
+
+def test_unpack_mod_file_truncated_chunk(tmp_path: Path):
+    data = b'abc' * 1000
+    compressed = zlib.compress(data)[:-8]  # the chunk table agrees with the damaged chunk
+    header = struct.pack('<QQQQ', 0x9e2a83c1, len(data), len(compressed), len(data))
+    src = tmp_path / 'asset.uasset.z'
+    src.write_bytes(header + struct.pack('<QQ', len(compressed), len(data)) + compressed)
+
+    with pytest.raises(AssertionError):
+        unpackModFile(str(src), str(tmp_path / 'asset.uasset'))
+
+
+def test_parse_acf_escaped_quotes():
+    data = parseAcf('"AppState"\n{\n\t"name"\t\t"Say \\"hi\\""\n\t"path"\t\t"C:\\\\Games"\n}\n')
+    assert data == {'AppState': {'name': 'Say \\"hi\\"', 'path': 'C:\\\\Games'}}
+
+
+def _pack_unreal_strings(*values: str) -> bytes:
+    return b''.join(struct.pack('<I', len(value) + 1) + value.encode('utf8') + b'\0' for value in values)
+
+
+def test_read_mod_info(tmp_path: Path):
+    filename = tmp_path / 'mod.info'
+    filename.write_bytes(_pack_unreal_strings('TestMod') + struct.pack('<I', 2) + _pack_unreal_strings('MapA', 'MapB'))
+
+    assert readModInfo(filename) == dict(modname='TestMod', maps=('MapA', 'MapB'))
+
+
+def test_read_mod_meta_info(tmp_path: Path):
+    filename = tmp_path / 'modmeta.info'
+    filename.write_bytes(struct.pack('<I', 2) + _pack_unreal_strings('ModType', '1', 'Guid', 'abc'))
+
+    assert readModMetaInfo(filename) == {'ModType': '1', 'Guid': 'abc'}
+
+
+def test_read_acf_file(tmp_path: Path):
+    filename = tmp_path / 'appworkshop_346110.acf'
+    filename.write_text(APPWORKSHOP_ACF, encoding='utf-8')
+
+    assert readACFFile(filename) == parseAcf(APPWORKSHOP_ACF)
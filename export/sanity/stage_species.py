@@ -1,6 +1,6 @@
 from collections import Counter
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from ark.overrides import get_overrides
 from ark.types import PrimalDinoCharacter
@@ -26,14 +26,18 @@ class SpeciesStage(ExportStage):
 
         # Count species by prefix (/Game/<part> or /Game/Mods/<id>)
         counter: Counter = Counter()
+        modids: Dict[str, str] = dict()  # mod folder name -> id, as there are only a few mods
         for clsname in find_sub_classes(PrimalDinoCharacter.get_ue_type()):
             if not clsname.startswith('/Game'):
                 continue
 
             parts = clsname.split('/')
             if clsname.startswith('/Game/Mods/'):
-                modid = self.manager.loader.get_mod_id(clsname)
-                assert modid
+                modid = modids.get(parts[3], None)
+                if modid is None:
+                    modid = self.manager.loader.get_mod_id(clsname)
+                    assert modid
+                    modids[parts[3]] = modid
                 parts[3] = modid
                 parts = parts[:4]
             else:
@@ -1,3 +1,4 @@
+from itertools import chain
 from typing import List
 
 from export.wiki.models import ClassRemap
@@ -13,12 +14,7 @@ def convert_npc_remaps(pgd: UAsset) -> List[ClassRemap]:
     export_data = pgd.default_export.properties
     npcs = export_data.get_property('Remap_NPC', fallback=None)
     containers = export_data.get_property('Remap_NPCSpawnEntries', fallback=None)
-    remaps = []
-
-    if npcs:
-        remaps += npcs.values
-    if containers:
-        remaps += containers.values
+    remaps = chain(npcs.values if npcs else (), containers.values if containers else ())
 
     out = []
     for entry in remaps:
@@ -86,27 +86,29 @@ class ItemsStage(JsonHierarchyExportStage):
         return ItemsExportModel
 
     def extract(self, proxy: UEProxyStructure) -> Any:
+        source = proxy.get_source()
+        asset: UAsset = source.asset
+        assert asset.assetname and asset.default_class
         if self.manager.config.export_wiki.RestrictPath:
             # Check this asset is within the path restriction
             goodpath = self.manager.config.export_wiki.RestrictPath
-            assetname = proxy.get_source().asset.assetname
-            if not assetname.startswith(goodpath):
+            if not asset.assetname.startswith(goodpath):
                 return None
 
         item: PrimalItem = cast(PrimalItem, proxy)
 
-        asset: UAsset = proxy.get_source().asset
-        assert asset.assetname and asset.default_class
         modid: Optional[str] = self.manager.loader.get_mod_id(asset.assetname)
         overrides = get_overrides_for_item(asset.assetname, modid)
         if overrides.skip_export:
             return None
 
+        # Pass everything in up-front as assignments are validated individually
+        bp = source.fullname
         out = Item(
             name=get_item_name(item),
-            bp=item.get_source().fullname,
+            bp=bp,
+            parent=get_parent_class(bp),
         )
-        out.parent = get_parent_class(out.bp)
 
         # Export minimal data if the item is likely a base class
         if is_item_base_class(item):
@@ -114,7 +116,9 @@ class ItemsStage(JsonHierarchyExportStage):
 
         # Export full data otherwise
         try:
-            icon_ref = item.get('ItemIconMaterialParent', fallback=item.get('ItemIcon', fallback=None))
+            icon_ref = item.get('ItemIconMaterialParent', fallback=None)
+            if icon_ref is None:
+                icon_ref = item.get('ItemIcon', fallback=None)
             out.description = str(item.get('ItemDescription', fallback=None))
             out.icon = _safe_get_bp_from_object(icon_ref)
 
@@ -163,7 +167,7 @@ class ItemsStage(JsonHierarchyExportStage):
                 out.cooking = convert_cooking_values(item)
 
         except Exception:  # pylint: disable=broad-except
-            logger.warning(f'Export conversion failed for {proxy.get_source().fullname}', exc_info=True)
+            logger.warning(f'Export conversion failed for {source.fullname}', exc_info=True)
             return None
 
         return out
@@ -83,7 +83,7 @@ class MapStage(ExportStage):
             if selectable_maps:
                 persistent = f'{directory}/{selectable_maps[0]}'
 
-            official = modid in self.manager.config.official_mods.ids()
+            official = self.manager.config.official_mods.has_id(modid)
             expansion = modid in self.manager.config.expansions.ids()
 
             logger.info(f'Performing extraction from map: {directory}')
@@ -1,6 +1,8 @@
 from logging import NullHandler, getLogger
-from typing import Any, Dict, cast
+from operator import attrgetter
+from typing import Any, Dict, FrozenSet, cast
 
+from automate.exporter import ExportManager, ExportRoot
 from automate.hierarchy_exporter import JsonHierarchyExportStage
 from ue.hierarchy import find_parent_classes, get_parent_class
 from ue.proxy import UEProxyStructure
@@ -37,8 +39,28 @@ OUTPUT_FLAGS = (
     'bUseBPGenerateMissionRewards',
 )
 
+# Fetches all the plain fields used by the export in one call
+_get_mission_fields = attrgetter(
+    'MissionDisplayName',
+    'MissionDescription',
+    'MissionMaxDurationSeconds',
+    'PerPlayerMissionCooldown',
+    'GlobalMissionCooldown',
+    'bUseBPStaticIsPlayerEligibleForMission',
+    'MaxPlayerCount',
+    'MinPlayerLevel',
+    'TargetPlayerLevel',
+    'MaxPlayerLevel',
+    'bUseBPGenerateMissionRewards',
+)
+
 
 class MissionsStage(JsonHierarchyExportStage):
+    ancestors: Dict[str, FrozenSet[str]]
+
+    def initialise(self, manager: ExportManager, root: ExportRoot):
+        super().initialise(manager, root)
+        self.ancestors = dict()  # parent class -> it and all of its ancestors, shared by sibling missions
 
     def get_format_version(self) -> str:
         return "3"
@@ -53,46 +75,54 @@ class MissionsStage(JsonHierarchyExportStage):
         return MissionType.get_ue_type()
 
     def extract(self, proxy: UEProxyStructure) -> Any:
+        source = proxy.get_source()
         if self.manager.config.export_wiki.RestrictPath:
             # Check this asset is within the path restriction
             goodpath = self.manager.config.export_wiki.RestrictPath
-            assetname = proxy.get_source().asset.assetname
+            assetname = source.asset.assetname
             if not assetname.startswith(goodpath):
                 return None
 
         mission: MissionType = cast(MissionType, proxy)
+        (name, description, duration, player_cooldown, mission_cooldown, bp_eligibility, max_players, min_level, target_level,
+         max_level, bp_rewards) = [field[0] for field in _get_mission_fields(mission)]
 
         v: Dict[str, Any] = dict(
-            bp=proxy.get_source().fullname,
+            bp=source.fullname,
             type='unknown',
-            name=mission.MissionDisplayName[0],
-            description=mission.MissionDescription[0],
+            name=name,
+            description=description,
         )
         v['parent'] = get_parent_class(v['bp'])
         v['flags'] = gather_flags(mission, OUTPUT_FLAGS)
-        v['duration'] = mission.MissionMaxDurationSeconds[0]
+        v['duration'] = duration
 
         v['cooldown'] = {
-            'player': mission.PerPlayerMissionCooldown[0],
-            'mission': mission.GlobalMissionCooldown[0],
+            'player': player_cooldown,
+            'mission': mission_cooldown,
         }
 
-        if not bool(mission.bUseBPStaticIsPlayerEligibleForMission[0]):
+        if not bool(bp_eligibility):
             v['prereqs'] = dict(
                 missions=mission.get('PrereqMissionTags', fallback=None),
-                playerCount=dict(max=mission.MaxPlayerCount[0], ),
+                playerCount=dict(max=max_players, ),
                 playerLevel=dict(
-                    min=mission.MinPlayerLevel[0],
-                    tgt=mission.TargetPlayerLevel[0],
-                    max=mission.MaxPlayerLevel[0],
+                    min=min_level,
+                    tgt=target_level,
+                    max=max_level,
                 ),
             )
 
         v['dinos'] = gather_dino_data(mission)
-        if not bool(mission.bUseBPGenerateMissionRewards[0]):
+        if not bool(bp_rewards):
             v['rewards'] = collect_rewards(mission)
 
-        _get_subclass_data(mission, v)
+        parents = self.ancestors.get(v['parent'], None)
+        if parents is None:
+            parents = frozenset(find_parent_classes(source))
+            self.ancestors[v['parent']] = parents
+
+        _get_subclass_data(mission, parents, v)
 
         if not v['dinos']:
             del v['dinos']
@@ -100,9 +130,7 @@ class MissionsStage(JsonHierarchyExportStage):
         return v
 
 
-def _get_subclass_data(mission: MissionType, v: Dict[str, Any]):
-    parents = set(find_parent_classes(mission.get_source()))
-
+def _get_subclass_data(mission: MissionType, parents: FrozenSet[str], v: Dict[str, Any]):
     for subtype, support_class in MISSION_TYPES.items():
         if subtype in parents:
             v['type'] = support_class.get_friendly_name()
@@ -3,6 +3,7 @@ from typing import Optional
 import pytest
 from pydantic import BaseModel, ValidationError
 
+from export.wiki.stage_items import Item
 from ue.properties import BoolProperty, FloatProperty, IntProperty, StringProperty
 from ue.utils import clean_float, sanitise_output
 
@@ -118,3 +119,15 @@ def test_plain_values_in_prop_fields():
     # put it in the constructor
     with pytest.raises(ValidationError):
         model = UETypedModel(float_prop_field=v)
+
+
+def test_base_class_item_output():
+    '''Ensure items exported as base classes only carry the fields that were set.'''
+    item = Item(name='Thing', bp='/Game/Thing.Thing_C', parent='/Game/Base.Base_C')
+
+    result = sanitise_output(item)
+    assert result == dict(name='Thing', bp='/Game/Thing.Thing_C', parent='/Game/Base.Base_C')
+
+    schema = Item.schema()
+    assert schema['properties']['flags']['default'] == []
+    assert schema['properties']['folders']['default'] == []
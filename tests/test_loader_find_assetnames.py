@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import Callable, Set, Tuple
 
@@ -72,3 +73,33 @@ def test_find_assetnames_excluding_all_force_include_ba(simple_loader: AssetLoad
     expected_normal, expected_inverted = filter_names(lambda path: path.startswith('/b/ba'))
     assert result_normal == expected_normal
     assert result_inverted == expected_inverted
+
+
+def test_find_assetnames_skips_excluded_dirs(simple_loader: AssetLoader, monkeypatch):
+    scanned: Set[str] = set()
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.add(Path(path).relative_to(DATA_PATH).as_posix())
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', recording_scandir)
+    result = set(simple_loader.find_assetnames('/', include=['/b/ba/.*'], exclude=['.*'], extension=['.txt']))
+
+    assert result == {'/b/ba/ba1', '/b/ba/ba2'}
+    assert scanned == {'.', 'b', 'b/ba'}
+
+
+def test_find_assetnames_ignores_dot_files(tmp_path: Path):
+    (tmp_path / 'b').mkdir()
+    (tmp_path / 'b' / '.txt').write_text('')
+    (tmp_path / 'b' / 'b1.txt').write_text('')
+    loader = AssetLoader(
+        assetpath=str(tmp_path),
+        modresolver=MockModResolver(),
+        cache_manager=MockCacheManager(),
+        rewrites={},
+        mod_aliases={},
+    )
+
+    assert set(loader.find_assetnames('/', extension=['.txt'])) == {'/b/b1'}
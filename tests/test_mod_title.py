@@ -0,0 +1,13 @@
+import pytest
+
+from automate.ark import ArkSteamManager
+
+from .common import *  # noqa: F401,F403  # needed to pick up all fixtures
+from .common import TEST_PGD_PKG
+
+
+@pytest.mark.requires_game
+def test_fetch_mod_title_from_pgd(arkman: ArkSteamManager):
+    moddata = dict(id='1821554891', name='PurloviaTEST', package=TEST_PGD_PKG)
+    title = arkman._fetch_mod_title_from_pgd(moddata)  # pylint: disable=protected-access
+    assert title
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import weakref
 from typing import TYPE_CHECKING, Optional, Set
 
 from utils.log import get_logger
@@ -312,7 +311,7 @@ class ExportTableItem(UEBase):
 
         # We deferred deserialising the properties until all imports/exports were defined
         stream = MemoryStream(self.stream, self.serial_offset, self.serial_size)
-        self._newField('properties', PropertyTable(self, weakref.proxy(stream)))
+        self._newField('properties', PropertyTable(self, stream))
         self.properties.link()
 
     def format_for_json(self):
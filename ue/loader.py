@@ -1,10 +1,13 @@
+import mmap
 import os.path
 import re
+import sys
 from abc import ABC, abstractmethod
 from configparser import ConfigParser
-from itertools import islice
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import psutil  # type: ignore
 
@@ -25,11 +28,13 @@ __all__ = (
     'AssetParseError',
     'AssetLoader',
     'load_file_into_memory',
+    'release_file_memory',
     'ModResolver',
     'IniModResolver',
 )
 
 NO_FALLBACK = object()
+NAME_CACHE_SIZE = 65536
 
 
 class AssetLoadException(Exception):
@@ -79,6 +84,7 @@ class IniModResolver(ModResolver):
     '''Old-style mod resolution by hand-crafted mods.ini.'''
     mods_id_to_names: Dict[str, str]
     mods_names_to_ids: Dict[str, str]
+    mods_exact_names_to_ids: Dict[str, str]
 
     def __init__(self, filename='mods.ini'):
         self.filename = filename
@@ -89,6 +95,7 @@ class IniModResolver(ModResolver):
         config.read(self.filename)
         self.mods_id_to_names = dict(config['ids'])
         self.mods_names_to_ids = dict((name.lower(), id) for id, name in config['ids'].items())
+        self.mods_exact_names_to_ids = dict((name, id) for id, name in config['ids'].items())
         # self.mods_id_to_longnames = dict(config['names'])
         return self
 
@@ -97,7 +104,10 @@ class IniModResolver(ModResolver):
         return name
 
     def get_id_from_name(self, name: str) -> Optional[str]:
-        modid = self.mods_names_to_ids.get(name.lower(), None)
+        # Names from cleaned asset paths are already in their canonical case
+        modid = self.mods_exact_names_to_ids.get(name, None)
+        if modid is None:
+            modid = self.mods_names_to_ids.get(name.lower(), None)
         return modid
 
 
@@ -298,7 +308,14 @@ class AssetLoader:
         self.max_memory = 0
         self.max_cache = 0
 
+        # Name conversions are pure string work repeated many times, so remember the most recent ones
+        self._cached_clean_asset_name = lru_cache(maxsize=NAME_CACHE_SIZE)(self._clean_asset_name)
+        self._cached_path_parts = lru_cache(maxsize=NAME_CACHE_SIZE)(self._convert_to_path_parts)
+
     def clean_asset_name(self, name: str) -> str:
+        return self._cached_clean_asset_name(name)
+
+    def _clean_asset_name(self, name: str) -> str:
         # Remove class name, if present
         if '.' in name:
             name = name[:name.index('.')]
@@ -320,7 +337,8 @@ class AssetLoader:
 
         result = '/' + '/'.join(parts)
 
-        return result
+        # Interned so the many references to each asset share a single string
+        return sys.intern(result)
 
     def wipe_cache(self) -> None:
         self.cache.wipe()
@@ -330,26 +348,7 @@ class AssetLoader:
 
     def convert_asset_name_to_path(self, name: str, partial=False, ext='.uasset', check_exists=True) -> Optional[Path]:
         '''Get the filename from which an asset can be loaded.'''
-        name = self.clean_asset_name(name)
-
-        # Handle any asset path rewrites
-        for prefix_from, prefix_to in self.rewrites_to_path.items():
-            if name.startswith(prefix_from):
-                name = prefix_to + name[len(prefix_from):]
-                break
-
-        parts = name.strip('/').split('/')
-
-        # Convert mod names to numbers
-        if len(parts) > 2 and parts[1].lower() == 'mods' and not parts[2].isnumeric():
-            modid = self.modresolver.get_id_from_name(parts[2])
-            if not modid:
-                raise ModNotFound(parts[2])
-            parts[2] = modid
-
-        # Game is replaced with Content
-        if parts and parts[0].lower() == 'game':
-            parts[0] = 'Content'
+        parts = list(self._get_path_parts(name))
 
         if not partial:
             parts[-1] += ext
@@ -369,6 +368,34 @@ class AssetLoader:
 
         return foundPath
 
+    def _get_path_parts(self, name: str) -> Tuple[str, ...]:
+        '''Convert an asset name into the components of its path relative to the asset directory.'''
+        return self._cached_path_parts(name)
+
+    def _convert_to_path_parts(self, name: str) -> Tuple[str, ...]:
+        cleaned = self.clean_asset_name(name)
+
+        # Handle any asset path rewrites
+        for prefix_from, prefix_to in self.rewrites_to_path.items():
+            if cleaned.startswith(prefix_from):
+                cleaned = prefix_to + cleaned[len(prefix_from):]
+                break
+
+        parts = cleaned.strip('/').split('/')
+
+        # Convert mod names to numbers
+        if len(parts) > 2 and parts[1].lower() == 'mods' and not parts[2].isnumeric():
+            modid = self.modresolver.get_id_from_name(parts[2])
+            if not modid:
+                raise ModNotFound(parts[2])
+            parts[2] = modid
+
+        # Game is replaced with Content
+        if parts and parts[0].lower() == 'game':
+            parts[0] = 'Content'
+
+        return tuple(parts)
+
     def get_mod_name(self, assetname: str) -> Optional[str]:
         assert assetname is not None
         assetname = self.clean_asset_name(assetname)
@@ -413,16 +440,46 @@ class AssetLoader:
         extensions = tuple(ext.lower() for ext in extensions)
         assert extensions
 
+        is_included = _build_matcher(includes)
+        is_excluded = _build_matcher(excludes)
+
+        # Directories can be skipped entirely if every asset within them is certain to be excluded
+        include_prefixes: List[str] = []
+        exclude_prefixes: List[str] = []
+        if excludes and not invert:
+            include_prefixes = [_split_literal_prefix(pattern)[0] for pattern in includes]
+            for pattern in excludes:
+                prefix, remainder = _split_literal_prefix(pattern)
+                if remainder in ('', '.*'):
+                    exclude_prefixes.append(prefix)
+
         toppath = self.convert_asset_name_to_path(toppath, partial=True)
-        for path, _, files in os.walk(toppath):
-            for filename in files:
-                fullpath = os.path.join(path, filename)
-                name, ext = os.path.splitext(fullpath)
+        if not toppath:
+            return
+
+        # Directories are tracked alongside their path relative to the asset root, so names can be built by simple joins
+        toprel = toppath.relative_to(self.asset_path).as_posix()
+        pending = [(str(toppath), '' if toprel == '.' else toprel + '/')]
+        while pending:
+            path, relpath = pending.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                # Unreadable or missing directories are skipped, as os.walk does
+                continue
+
+            subdirs: List[Tuple[str, str]] = []
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append((entry.path, relpath + entry.name + '/'))
+                    continue
 
+                stem, ext = os.path.splitext(entry.name)
                 if ext.lower() not in extensions:
                     continue
 
-                partialpath = str(Path(fullpath).relative_to(self.asset_path).with_suffix(''))
+                partialpath = relpath + stem
                 assetname = self.clean_asset_name(partialpath)
 
                 # Handle any asset path rewrites
@@ -435,29 +492,58 @@ class AssetLoader:
 
                 # Apply filtering, starting with forced inclusions
                 matched = True
-                if any(re.match(include, assetname) for include in includes):
+                if is_included(assetname):
                     # ...skip the exclusion test
                     pass
                 # Then handle exclusions with a lower priority
-                elif any(re.match(exclude, assetname) for exclude in excludes):
+                elif is_excluded(assetname):
                     matched = False
 
                 # Yield or skip this entry (force bool because xor behaves differently with non-bools)
                 if matched ^ bool(invert):
                     yield result
 
+            # Continue depth-first in the order found, matching os.walk
+            for subdir in reversed(subdirs):
+                if exclude_prefixes and self._is_dir_excluded(subdir[1], include_prefixes, exclude_prefixes):
+                    continue
+                pending.append(subdir)
+
+    def _is_dir_excluded(self, relpath: str, include_prefixes: List[str], exclude_prefixes: List[str]) -> bool:
+        '''Check if every asset within a directory (relative to the asset path) will be excluded by `find_assetnames`.'''
+        if '.' in relpath:
+            # Asset names are truncated at a dot, so this directory's assets may not share its prefix
+            return False
+
+        try:
+            dirname = self.clean_asset_name(relpath) + '/'
+        except ModNotFound:
+            return False
+
+        if not any(dirname.startswith(prefix) for prefix in exclude_prefixes):
+            return False
+
+        # Inclusions take priority over exclusions, and rewrites could move assets out of the excluded prefix
+        for prefix in chain(include_prefixes, self.rewrites_to_asset):
+            if prefix.startswith(dirname) or dirname.startswith(prefix):
+                return False
+
+        return True
+
     def load_related(self, obj: UEBase) -> UAsset:
-        if isinstance(obj, Property):
-            return self.load_related(obj.value)
-        if isinstance(obj, ObjectProperty):
-            return self.load_related(obj.value.value)
-        if isinstance(obj, ImportTableItem):
-            assetname = str(obj.namespace.value.name.value)
-            loader = obj.asset.loader
-            asset = loader[assetname]
-            return asset
-
-        raise ValueError(f"Unsupported type for load_related '{type(obj)}'")
+        # Unwrap properties until the import they refer to is reached
+        while True:
+            if isinstance(obj, Property):
+                obj = obj.value
+            elif isinstance(obj, ObjectProperty):
+                obj = obj.value.value
+            elif isinstance(obj, ImportTableItem):
+                assetname = str(obj.namespace.value.name.value)
+                loader = obj.asset.loader
+                asset = loader[assetname]
+                return asset
+            else:
+                raise ValueError(f"Unsupported type for load_related '{type(obj)}'")
 
     def load_class(self, fullname: str, fallback=NO_FALLBACK, quiet=False) -> ExportTableItem:
         (assetname, cls_name) = fullname.split('.')
@@ -488,11 +574,17 @@ class AssetLoader:
         Returns (memoryview, ext).
         '''
         name = self.clean_asset_name(name)
-        mem = None
+        *dirs, filename = self._get_path_parts(name)
         for ext in ('.uasset', '.umap'):
-            path = self.convert_asset_name_to_path(name, ext=ext)
-            if path and path.is_file():
-                mem = load_file_into_memory(path)
+            # Try the exact path first, letting the open itself check it exists
+            mem = _load_file_if_present(Path(self.asset_path, *dirs, filename + ext))
+            if mem is None:
+                # Check for case-insensitive match
+                path = find_caseinsensitive_path(self.asset_path, *dirs, filename + ext)
+                if path:
+                    mem = _load_file_if_present(path)
+
+            if mem is not None:
                 return (mem, ext)
 
         raise AssetNotFound(name)
@@ -546,7 +638,7 @@ class AssetLoader:
             except Exception as ex:
                 raise AssetParseError(assetname) from ex
         finally:
-            mem.release()
+            release_file_memory(mem)
 
         leafname = assetname.split('/')[-1]
 
@@ -575,6 +667,62 @@ class AssetLoader:
         return asset
 
 
+REGEX_SPECIAL_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+
+def _split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    '''
+    Split a regex into a literal prefix that every match must begin with, and the remainder of the pattern.
+    This is conservative - the prefix may be shorter than strictly necessary.
+
+    >>> _split_literal_prefix('/Game/Mods/.*')
+    ('/Game/Mods/', '.*')
+    >>> _split_literal_prefix('/Game/Mods/Abc?')
+    ('/Game/Mods/Ab', 'c?')
+    >>> _split_literal_prefix('/Game/A|/Game/B')
+    ('', '/Game/A|/Game/B')
+    '''
+    if '|' in pattern:
+        return ('', pattern)
+
+    for i, char in enumerate(pattern):
+        if char in REGEX_SPECIAL_CHARS:
+            # A quantifier applies to the preceding character, so it cannot be part of the prefix
+            if char in '*+?{' and i:
+                i -= 1
+            return (pattern[:i], pattern[i:])
+
+    return (pattern, '')
+
+
+def _build_matcher(patterns: Iterable[str]) -> Callable[[str], bool]:
+    '''
+    Build a function that checks if a name is matched (as `re.match`) by any of the given patterns.
+    Patterns that only test for a literal prefix are checked with a single `str.startswith` instead of as regexes.
+
+    >>> matcher = _build_matcher(['/Game/Mods/.*', '/Game/PrimalEarth/Dinos', '/Game/[AB]/'])
+    >>> matcher('/Game/Mods/Test/Item'), matcher('/Game/PrimalEarth/Dinos/Rex'), matcher('/Game/B/Thing')
+    (True, True, True)
+    >>> matcher('/Game/PrimalEarth/Test'), matcher('/Game/C/Thing')
+    (False, False)
+    '''
+    prefixes: List[str] = []
+    regexes: List[re.Pattern] = []
+    for pattern in patterns:
+        prefix, remainder = _split_literal_prefix(pattern)
+        if remainder in ('', '.*'):
+            prefixes.append(prefix)
+        else:
+            regexes.append(re.compile(pattern))
+
+    prefixes_tuple = tuple(prefixes)
+
+    def matcher(name: str) -> bool:
+        return name.startswith(prefixes_tuple) or any(regex.match(name) for regex in regexes)
+
+    return matcher
+
+
 def find_caseinsensitive_path(base: Path, *parts: str) -> Optional[Path]:
     if not parts:
         return base
@@ -617,8 +765,35 @@ def find_caseinsensitive_path_match(path: Path) -> Optional[Path]:
     return None
 
 
-def load_file_into_memory(filename):
+def load_file_into_memory(filename) -> memoryview:
+    '''
+    Map a file into memory, read-only.
+    Pages are only read from disk as they are touched, avoiding a full copy of the file.
+    '''
     with open(filename, 'rb') as f:
-        data = f.read()
-        mem = memoryview(data)
-    return mem
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return memoryview(f.read())
+
+    return memoryview(mapped)
+
+
+def _load_file_if_present(filename) -> Optional[memoryview]:
+    try:
+        return load_file_into_memory(filename)
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+
+
+def release_file_memory(mem: memoryview):
+    '''Release memory returned by `load_file_into_memory`, closing the file mapping if possible.'''
+    mapped = mem.obj
+    mem.release()
+    if isinstance(mapped, mmap.mmap):
+        try:
+            mapped.close()
+        except BufferError:
+            # Something still holds a view on the data - leave the mapping to be closed when it is collected
+            pass
@@ -47,7 +47,9 @@ class PropertyTable(UEBase):
     values: List["Property"]
 
     def as_dict(self) -> PropDict:
-        return self._as_dict or self._convert_to_dict()
+        if self._as_dict is not None:
+            return self._as_dict
+        return self._convert_to_dict()
 
     def get_property(self, name: str, index: int = 0, fallback=NO_FALLBACK) -> UEBase:
         value = self.as_dict()[name][index]
@@ -927,7 +929,9 @@ class StructProperty(UEBase):
             self.field_values['count'] += 1
 
     def as_dict(self) -> Dict[str, UEBase]:
-        return self._as_dict or self._convert_to_dict()
+        if self._as_dict is not None:
+            return self._as_dict
+        return self._convert_to_dict()
 
     def get_property(self, name: str, fallback=NO_FALLBACK) -> UEBase:
         value = self.as_dict()[name]
@@ -1,7 +1,10 @@
 import struct
+import sys
 
 __all__ = ('MemoryStream', )
 
+INTERN_MAX_LENGTH = 64  # short strings are mostly names, which repeat across every asset
+
 
 class MemoryStream:
     mem: memoryview
@@ -70,13 +73,20 @@ class MemoryStream:
         return raw_bytes
 
     def readTerminatedString(self, size: int, encoding='utf8'):
-        raw_bytes = self.readBytes(size)
-        value = bytes(raw_bytes[:-1]).decode(encoding)
+        value = self._readTerminated(size, 1, encoding)
+        if size <= INTERN_MAX_LENGTH:
+            value = sys.intern(value)
         return value
 
     def readTerminatedWideString(self, size: int):
-        raw_bytes = self.readBytes(size * 2)
-        value = bytes(raw_bytes[:-2]).decode('utf-16-le')
+        return self._readTerminated(size * 2, 2, 'utf-16-le')
+
+    def _readTerminated(self, size: int, terminator_size: int, encoding: str) -> str:
+        if self.offset + size > self.end:
+            raise EOFError("End of stream")
+        # Decode straight from the buffer, without copying it or the terminator out first
+        value = str(self.mem[self.offset:self.offset + max(size - terminator_size, 0)], encoding)
+        self.offset += size
         return value
 
     def _read(self, fmt, count: int = None):
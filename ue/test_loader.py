@@ -1,10 +1,12 @@
 import os.path
+from pathlib import Path
 
-from pytest import fixture  # type: ignore
+from pytest import fixture, raises  # type: ignore
 
 from tests.common import MockModResolver
 
-from .loader import AssetLoader
+from .loader import AssetLoader, load_file_into_memory, release_file_memory
+from .stream import MemoryStream
 
 
 @fixture
@@ -51,3 +53,15 @@ def test_convert_asset_name_to_path(loader):
     assert convert('Game/One/Two') == f'{base}{s}Content{s}One{s}Two.uasset'
     assert convert('Game/One/Two/') == f'{base}{s}Content{s}One{s}Two.uasset'
     assert convert('/Game/One/Two/') == f'{base}{s}Content{s}One{s}Two.uasset'
+
+
+def test_stream_unreadable_after_release(tmp_path: Path):
+    filename = tmp_path / 'asset.uasset'
+    filename.write_bytes(b'Some data\0')
+
+    mem = load_file_into_memory(filename)
+    stream = MemoryStream(mem)
+    release_file_memory(mem)
+
+    with raises(ValueError):
+        stream.readTerminatedString(10)
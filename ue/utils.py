@@ -41,26 +41,44 @@ def get_clean_namespaced_name(ns: UEBase, name: UEBase) -> str:
     return name_str  # type: ignore
 
 
+# How get_clean_name should treat each type, keyed by class name to avoid circular imports
+_CLEAN_NAME_STRING = 1
+_CLEAN_NAME_OBJECT = 2
+_CLEAN_NAME_TABLE_ITEM = 3
+_CLEAN_NAME_HANDLERS = {
+    'NameIndex': _CLEAN_NAME_STRING,
+    'StringProperty': _CLEAN_NAME_STRING,
+    'NameProperty': _CLEAN_NAME_STRING,
+    'ObjectIndex': _CLEAN_NAME_OBJECT,
+    'ObjectProperty': _CLEAN_NAME_OBJECT,
+    'ImportTableItem': _CLEAN_NAME_TABLE_ITEM,
+    'ExportTableItem': _CLEAN_NAME_TABLE_ITEM,
+}
+
+
 def get_clean_name(obj: UEBase, fallback: str = None) -> Optional[str]:
-    if obj is None:
-        return fallback
-    elif obj.__class__.__name__ in ('NameIndex', 'StringProperty', 'NameProperty'):
-        value = str(obj).strip()
-        return fallback if value == 'None' else value
-    elif obj.__class__.__name__ in ('ObjectIndex', 'ObjectProperty'):
-        return get_clean_name(obj.value, fallback)
-    elif obj.__class__.__name__ in ('ImportTableItem', 'ExportTableItem'):
-        return get_clean_name(obj.name, fallback)
+    while obj is not None:
+        handler = _CLEAN_NAME_HANDLERS.get(obj.__class__.__name__, None)
+        if handler == _CLEAN_NAME_STRING:
+            value = str(obj).strip()
+            return fallback if value == 'None' else value
+        elif handler == _CLEAN_NAME_OBJECT:
+            obj = obj.value
+        elif handler == _CLEAN_NAME_TABLE_ITEM:
+            obj = obj.name
+        else:
+            return fallback
 
     return fallback
 
 
 def get_property(export, name) -> Optional[UEBase]:
-    for prop in export.properties:
-        if str(prop.header.name) == name:
-            return prop.value
+    # Use the property table's name index rather than scanning every property
+    values = export.properties.as_dict().get(name, None)
+    if not values:
+        return None
 
-    return None
+    return next(iter(values.values()))
 
 
 def sanitise_output(node):